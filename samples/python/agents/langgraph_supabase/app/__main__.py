@@ -2,11 +2,13 @@ import logging
 import os
 import sys
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import click
 import httpx
 import uvicorn
 
-from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.tasks import (
     BasePushNotificationSender,
@@ -19,9 +21,11 @@ from a2a.types import (
     AgentSkill,
 )
 from dotenv import load_dotenv
+from starlette.applications import Starlette
 
-from app.agent import SupabaseAgent
+from app.agent import SupabaseAgent, close_mcp_transport
 from app.agent_executor import SupabaseAgentExecutor
+from app.responses import ORJSONA2AStarletteApplication
 
 
 load_dotenv()
@@ -29,55 +33,105 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Push notifications fan out to many subscriber hosts; keep enough pooled
+# keep-alive connections around to avoid a fresh TCP/TLS handshake per call.
+HTTPX_LIMITS = httpx.Limits(
+    max_connections=200,
+    max_keepalive_connections=100,
+    keepalive_expiry=30.0,
+)
+HTTPX_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+
 
 class MissingAPIKeyError(Exception):
     """Exception for missing API key."""
 
 
+# Server settings shared by the direct uvicorn run and the gunicorn worker.
+UVICORN_SETTINGS = {
+    # Select the fast loop and HTTP parser explicitly rather than relying on
+    # uvicorn's optional-import detection.
+    'loop': 'asyncio' if sys.platform == 'win32' else 'uvloop',
+    'http': 'httptools',
+    # Per-request access logging and proxy header rewriting add overhead to
+    # every streamed chunk; neither is needed here.
+    'access_log': False,
+    'proxy_headers': False,
+    'server_header': False,
+    'date_header': False,
+}
+
+
+def build_app(host: str, port: int) -> Starlette:
+    """Builds the Supabase Agent A2A Starlette application."""
+    capabilities = AgentCapabilities(streaming=True, push_notifications=True)
+    skill = AgentSkill(
+        id='query_supabase',
+        name='Supabase Database Query Tool',
+        description='Helps with querying data from Supabase databases via MCP',
+        tags=['supabase', 'database', 'query', 'mcp'],
+        examples=['What data is in the users table?', 'Query all records from products table'],
+    )
+    agent_card = AgentCard(
+        name='Supabase Agent',
+        description='Helps with querying Supabase databases via MCP tools',
+        url=f'http://{host}:{port}/',
+        version='1.0.0',
+        default_input_modes=SupabaseAgent.SUPPORTED_CONTENT_TYPES,
+        default_output_modes=SupabaseAgent.SUPPORTED_CONTENT_TYPES,
+        capabilities=capabilities,
+        skills=[skill],
+    )
+
+
+    # --8<-- [start:DefaultRequestHandler]
+    httpx_client = httpx.AsyncClient(
+        limits=HTTPX_LIMITS, http2=True, timeout=HTTPX_TIMEOUT
+    )
+    push_config_store = InMemoryPushNotificationConfigStore()
+    push_sender = BasePushNotificationSender(httpx_client=httpx_client,
+                    config_store=push_config_store)
+    request_handler = DefaultRequestHandler(
+        agent_executor=SupabaseAgentExecutor(),
+        task_store=InMemoryTaskStore(),
+        push_config_store=push_config_store,
+        push_sender= push_sender
+    )
+    server = ORJSONA2AStarletteApplication(
+        agent_card=agent_card, http_handler=request_handler
+    )
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        try:
+            yield
+        finally:
+            await httpx_client.aclose()
+            await close_mcp_transport()
+
+    return server.build(lifespan=lifespan)
+    # --8<-- [end:DefaultRequestHandler]
+
+
+def app_factory() -> Starlette:
+    """Builds the application for gunicorn from HOST/PORT env variables.
+
+    Run with: gunicorn 'app.__main__:app_factory()' -c gunicorn.conf.py
+    """
+    return build_app(
+        os.getenv('HOST', 'localhost'), int(os.getenv('PORT', '10001'))
+    )
+
+
 @click.command()
 @click.option('--host', 'host', default='localhost')
 @click.option('--port', 'port', default=10001)
 def main(host, port):
     """Starts the Supabase Agent server."""
     try:
-
-        capabilities = AgentCapabilities(streaming=True, push_notifications=True)
-        skill = AgentSkill(
-            id='query_supabase',
-            name='Supabase Database Query Tool',
-            description='Helps with querying data from Supabase databases via MCP',
-            tags=['supabase', 'database', 'query', 'mcp'],
-            examples=['What data is in the users table?', 'Query all records from products table'],
+        uvicorn.run(
+            build_app(host, port), host=host, port=port, **UVICORN_SETTINGS
         )
-        agent_card = AgentCard(
-            name='Supabase Agent',
-            description='Helps with querying Supabase databases via MCP tools',
-            url=f'http://{host}:{port}/',
-            version='1.0.0',
-            default_input_modes=SupabaseAgent.SUPPORTED_CONTENT_TYPES,
-            default_output_modes=SupabaseAgent.SUPPORTED_CONTENT_TYPES,
-            capabilities=capabilities,
-            skills=[skill],
-        )
-
-
-        # --8<-- [start:DefaultRequestHandler]
-        httpx_client = httpx.AsyncClient()
-        push_config_store = InMemoryPushNotificationConfigStore()
-        push_sender = BasePushNotificationSender(httpx_client=httpx_client,
-                        config_store=push_config_store)
-        request_handler = DefaultRequestHandler(
-            agent_executor=SupabaseAgentExecutor(),
-            task_store=InMemoryTaskStore(),
-            push_config_store=push_config_store,
-            push_sender= push_sender
-        )
-        server = A2AStarletteApplication(
-            agent_card=agent_card, http_handler=request_handler
-        )
-
-        uvicorn.run(server.build(), host=host, port=port)
-        # --8<-- [end:DefaultRequestHandler]
 
     except MissingAPIKeyError as e:
         logger.error(f'Error: {e}')
@@ -1,19 +1,190 @@
+# ruff: noqa: PLC0415
+from __future__ import annotations
+
 import os
 import asyncio
-from collections.abc import AsyncIterable
-from typing import Any, Literal
-
-from langchain_core.messages import AIMessage, ToolMessage
-from langchain_core.tools import BaseTool
-from langchain_core.tools.structured import StructuredTool
-from langchain_openai import AzureChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.prebuilt import create_react_agent
+import functools
+import hashlib
+import json
+import logging
+import time
+
+# ToolNode resolves the tool wrapper's annotations at runtime.
+from collections.abc import Awaitable, Callable  # noqa: TC003
+from pathlib import Path
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Literal
+
+import httpx
+
+from cachetools import TTLCache
 from pydantic import BaseModel
-from langchain_mcp_adapters.client import MultiServerMCPClient
 
+from app.offload import OffloadStore
+from app.tool_retrieval import RETRIEVAL_TOOL_NAME
+
+
+# LangChain, LangGraph, the OpenAI client and the MCP adapters pull in
+# hundreds of modules; they are imported where first used so the server
+# starts without paying for them.
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterable, Mapping
+
+    from langchain_core.tools import BaseTool
+    from langchain_openai import AzureChatOpenAI
+    from langgraph.checkpoint.memory import MemorySaver
+    from langgraph.graph.state import CompiledStateGraph
+
+
+__all__ = ['ResponseFormat', 'SupabaseAgent', 'close_mcp_transport']
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_memory() -> MemorySaver:
+    """Return the process-wide checkpointer shared by all agent graphs."""
+    from langgraph.checkpoint.memory import MemorySaver
+
+    return MemorySaver()
+
+
+# Fixed responses yielded by SupabaseAgent.stream(); read-only so they can be
+# shared across every yield instead of rebuilt per graph step.
+_QUERY_EVENT = MappingProxyType({
+    'is_task_complete': False,
+    'require_user_input': False,
+    'content': 'Querying Supabase database via MCP...',
+})
+_PROCESS_EVENT = MappingProxyType({
+    'is_task_complete': False,
+    'require_user_input': False,
+    'content': 'Processing database results...',
+})
+_FALLBACK_RESPONSE = MappingProxyType({
+    'is_task_complete': False,
+    'require_user_input': True,
+    'content': (
+        'We are unable to process your request at the moment. '
+        'Please try again.'
+    ),
+})
+
+
+@functools.lru_cache(maxsize=1)
+def _get_model() -> AzureChatOpenAI:
+    """Return the process-wide chat model shared by all agent instances."""
+    from langchain_openai import AzureChatOpenAI
+
+    return AzureChatOpenAI(
+        api_key=os.getenv('AZURE_OPENAI_API_KEY'),
+        api_version=os.getenv('AZURE_OPENAI_API_VERSION'),
+        azure_deployment=os.getenv('AZURE_OPENAI_DEPLOYMENT_NAME'),
+        azure_endpoint=os.getenv('AZURE_OPENAI_ENDPOINT'),
+        temperature=1,
+    )
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """Delegate to one pooled transport and ignore per-client close().
+
+    The MCP client opens (and closes) a fresh httpx.AsyncClient for every
+    session, which would otherwise discard its connection pool and pay a new
+    TCP/TLS handshake per tool call.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(
+        self, request: httpx.Request
+    ) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        # The shared pool outlives individual MCP sessions.
+        pass
 
-memory = MemorySaver()
+    async def aclose_pool(self) -> None:
+        """Close the shared pool itself."""
+        await self._transport.aclose()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_mcp_transport() -> _SharedTransport:
+    """Return the process-wide pooled transport used for MCP HTTP calls."""
+    return _SharedTransport(
+        httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=50),
+        )
+    )
+
+
+async def close_mcp_transport() -> None:
+    """Close the pooled MCP transport, if one was created."""
+    if _get_mcp_transport.cache_info().currsize:
+        await _get_mcp_transport().aclose_pool()
+        _get_mcp_transport.cache_clear()
+
+
+def _mcp_httpx_client_factory(
+    headers: dict[str, str] | None = None,
+    timeout: httpx.Timeout | None = None,
+    auth: httpx.Auth | None = None,
+) -> httpx.AsyncClient:
+    """Build MCP session clients on top of the shared pooled transport."""
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout or httpx.Timeout(30.0),
+        auth=auth,
+        follow_redirects=True,
+        transport=_get_mcp_transport(),
+    )
+
+
+@functools.lru_cache(maxsize=512)
+def _extract_defaults(schema_json: str) -> tuple[tuple[str, Any], ...]:
+    """Return the `(arg, default)` pairs declared in a JSON-schema string.
+
+    Keyed on the serialized schema so identical tool schemas are only walked
+    once per process, however many times the tools are (re)wrapped.
+    """
+    schema = json.loads(schema_json)
+    properties = schema.get('properties') or {}
+    if not isinstance(properties, dict):
+        return ()
+
+    return tuple(
+        (str(key), prop['default'])
+        for key, prop in properties.items()
+        if isinstance(prop, dict) and 'default' in prop
+    )
+
+
+class _ResultCache(TTLCache):
+    """TTLCache of tool results with a generation bumped on invalidation.
+
+    A read only stores its result if the generation is unchanged since it
+    started, so a write that finishes mid-read cannot leave a stale entry.
+    """
+
+    generation = 0
+
+    def invalidate(self) -> None:
+        """Drop every cached result and start a new generation."""
+        self.generation += 1
+        self.clear()
+
+
+def _tools_fingerprint(tools: list[BaseTool]) -> str:
+    """Hash the names, descriptions and argument schemas of a tool list."""
+    payload = json.dumps(
+        [(t.name, t.description, t.args_schema) for t in tools],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
 
 
 class ResponseFormat(BaseModel):
@@ -41,99 +212,343 @@ class SupabaseAgent:
         'Set response status to completed if the request is complete.'
     )
 
-    def __init__(self):
+    RETRIEVAL_INSTRUCTION = (
+        f' Tools are loaded on demand: call {RETRIEVAL_TOOL_NAME} with keywords '
+        'describing what you need, then call the tools it returns.'
+    )
 
-        print("Initializing SupabaseAgent...")
-        print(f"Using MCP server URL: {os.getenv('SUPABASE_MCP_SERVER_URL', 'http://localhost:3000')}")
-        print(f"Using SUPABASE_API_KEY: {'set' if os.getenv('SUPABASE_API_KEY') else 'not set'}")
-        print(f"Using AZURE_OPENAI_API_KEY: {'set' if os.getenv('AZURE_OPENAI_API_KEY') else 'not set'}")
-        self.model = AzureChatOpenAI(
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            api_version=os.getenv('AZURE_OPENAI_API_VERSION'),
-            azure_deployment=os.getenv('AZURE_OPENAI_DEPLOYMENT_NAME'),
-            azure_endpoint=os.getenv('AZURE_OPENAI_ENDPOINT'),
-            temperature=1,
-        )
+    # ResponseFormat.status -> (is_task_complete, require_user_input)
+    _STATUS_TEMPLATES = {
+        'input_required': (False, True),
+        'error': (False, True),
+        'completed': (True, False),
+    }
+
+    # Tool-name fragments whose results are never cached: anything that can
+    # write (or run arbitrary SQL) has uncertain cacheability.
+    DEFAULT_CACHE_BYPASS_TOOLS = (
+        'execute,apply,create,update,delete,insert,deploy,merge,reset,'
+        'rebase,pause,restore,confirm'
+    )
+
+    # Wrapped MCP tools shared across agent instances, keyed by
+    # (mcp_server_url, api_key_hash) -> (fetched_at, tools).
+    _TOOLS_CACHE: dict[tuple[str, str], tuple[float, list[BaseTool]]] = {}
+
+    # Compiled ReAct graphs keyed by (mcp_server_url, api_key_hash,
+    # tool_mode, tool_schema_hash), so a tool refresh that returns the same
+    # schemas reuses the compiled graph. Only the latest graph per
+    # (mcp_server_url, api_key_hash, tool_mode) is kept.
+    _GRAPH_CACHE: dict[tuple[str, str, str, str], Any] = {}
+    _GRAPH_LOCK = asyncio.Lock()
+
+    def __init__(self):
         self.mcp_server_url = os.getenv("SUPABASE_MCP_SERVER_URL", "http://localhost:3000")
+        # "all" binds every MCP tool to the model; "retrieval" binds a single
+        # mcp_retrieval tool and only the tools it returns.
+        self.tool_mode = os.getenv('SUPABASE_AGENT_TOOL_MODE', 'all').lower()
+        self.cache_ttl_seconds = float(os.getenv('MCP_TOOLS_TTL', '300'))
+        self.result_cache_ttl = float(os.getenv('MCP_RESULT_CACHE_TTL', '60'))
+        self.max_concurrent_tool_calls = int(os.getenv('MCP_MAX_CONCURRENCY', '8'))
+        self.cache_bypass_tools = tuple(
+            fragment.strip().lower()
+            for fragment in os.getenv(
+                'MCP_CACHE_BYPASS_TOOLS', self.DEFAULT_CACHE_BYPASS_TOOLS
+            ).split(',')
+            if fragment.strip()
+        )
+        # Tool outputs larger than MCP_OFFLOAD_THRESHOLD bytes are stored under
+        # MCP_OFFLOAD_DIR (a fresh private temp dir by default) and replaced by
+        # a storage_ref stub (0 disables).
+        offload_threshold = int(os.getenv('MCP_OFFLOAD_THRESHOLD', '0'))
+        offload_dir = os.getenv('MCP_OFFLOAD_DIR')
+        self.offload_store = (
+            OffloadStore(
+                Path(offload_dir) if offload_dir else None,
+                offload_threshold,
+                max_bytes=int(
+                    os.getenv('MCP_OFFLOAD_MAX_BYTES', str(256 * 1024 * 1024))
+                ),
+                max_age=float(os.getenv('MCP_OFFLOAD_MAX_AGE', '3600')),
+            )
+            if offload_threshold > 0
+            else None
+        )
         self.mcp_client = None
         self.tools = []
         self.graph = None
+        self._tools_fetched_at = float('-inf')
+
+    @functools.cached_property
+    def model(self) -> AzureChatOpenAI:
+        """The shared chat model, created on first use."""
+        return _get_model()
 
     @staticmethod
-    def _wrap_tool_with_schema_defaults(tool: BaseTool) -> BaseTool:
-        """Wrap an MCP-backed tool to apply JSON-schema defaults.
+    def _wrap_tool_with_cache_and_defaults(
+        tool: BaseTool,
+        result_cache: _ResultCache | None = None,
+        offload_store: OffloadStore | None = None,
+        semaphore: asyncio.Semaphore | None = None,
+        invalidate_cache: bool = False,
+    ) -> BaseTool:
+        """Wrap an MCP-backed tool to apply JSON-schema defaults and cache results.
 
         Supabase MCP tool schemas sometimes mark fields as required even when a
         default is provided (e.g. `schemas: ["public"]`). LLMs may omit those
         fields, causing tool calls to fail server-side.
 
         This wrapper injects `properties.<arg>.default` when an arg is missing.
+        When `result_cache` is given, results are memoized by
+        `(tool name, arguments)` so identical calls re-issued by the LLM skip
+        the MCP round-trip; with `invalidate_cache` the tool is never served
+        from the cache and instead clears it on every call, since it may have
+        changed what cached reads would return. When `offload_store` is given,
+        large outputs are replaced by a `storage_ref` stub the model can page
+        through with `read_storage_ref`. When `semaphore` is given, it bounds how
+        many MCP calls run at once when the LLM issues parallel tool calls.
         """
 
-        if not isinstance(tool, StructuredTool):
-            return tool
-
-        schema = getattr(tool, "args_schema", None)
-        if not isinstance(schema, dict):
-            return tool
+        from langchain_core.tools.structured import StructuredTool
 
-        properties: dict[str, Any] = schema.get("properties") or {}
-        if not isinstance(properties, dict) or not properties:
+        if not isinstance(tool, StructuredTool) or tool.coroutine is None:
             return tool
 
-        defaults: dict[str, Any] = {}
-        for key, prop in properties.items():
-            if isinstance(prop, dict) and "default" in prop and key is not None:
-                defaults[str(key)] = prop["default"]
+        defaults: tuple[tuple[str, Any], ...] = ()
+        schema = getattr(tool, "args_schema", None)
+        if isinstance(schema, dict):
+            try:
+                defaults = _extract_defaults(json.dumps(schema, sort_keys=True))
+            except (TypeError, ValueError):
+                defaults = ()
 
-        if not defaults:
+        if (
+            not defaults
+            and result_cache is None
+            and offload_store is None
+            and semaphore is None
+        ):
             return tool
 
         original_coroutine = tool.coroutine
 
-        async def call_tool_with_defaults(**arguments: dict[str, Any]):
-            for key, value in defaults.items():
-                if key not in arguments or arguments[key] is None:
+        # Bind the defaults, cache, store and wrapped coroutine as keyword
+        # defaults so they are fast locals on every call instead of closure
+        # lookups.
+        async def call_tool_with_cache_and_defaults(
+            *,
+            _d: tuple[tuple[str, Any], ...] = defaults,
+            _f: Callable[..., Awaitable[Any]] = original_coroutine,
+            _c: _ResultCache | None = result_cache,
+            _o: OffloadStore | None = offload_store,
+            _s: asyncio.Semaphore | None = semaphore,
+            _n: str = tool.name,
+            _i: bool = invalidate_cache and result_cache is not None,
+            **arguments: Any,
+        ) -> Any:
+            for key, value in _d:
+                if arguments.get(key) is None:
                     arguments[key] = value
-            return await original_coroutine(**arguments)
+
+            cache_key = None
+            if _c is not None and not _i:
+                cache_key = (
+                    _n,
+                    json.dumps(arguments, sort_keys=True, default=str),
+                )
+                try:
+                    return _c[cache_key]
+                except KeyError:
+                    pass
+                generation = _c.generation
+
+            try:
+                if _s is None:
+                    result = await _f(**arguments)
+                else:
+                    async with _s:
+                        result = await _f(**arguments)
+            finally:
+                if _i:
+                    _c.invalidate()
+            if _o is not None:
+                result = await _o.offload_result(result)
+            if cache_key is not None and _c.generation == generation:
+                _c[cache_key] = result
+            return result
 
         return StructuredTool(
             name=tool.name,
             description=tool.description,
             args_schema=tool.args_schema,
-            coroutine=call_tool_with_defaults,
+            coroutine=call_tool_with_cache_and_defaults,
             response_format=getattr(tool, "response_format", "content"),
             metadata=getattr(tool, "metadata", None),
         )
 
+    def _is_cacheable(self, tool: BaseTool) -> bool:
+        """Whether a tool's results may be served from the result cache.
+
+        Tools that are not cacheable clear the result cache when called.
+        """
+        name = tool.name.lower()
+        return not any(fragment in name for fragment in self.cache_bypass_tools)
+
+    async def _load_tools(
+        self, cache_key: tuple[str, str]
+    ) -> tuple[float, list[BaseTool]]:
+        """Return `(fetched_at, tools)`, reusing a cached list within the TTL."""
+        cached = self._TOOLS_CACHE.get(cache_key)
+        if cached and time.monotonic() - cached[0] < self.cache_ttl_seconds:
+            return cached
+
+        tools = await self.mcp_client.get_tools()
+        result_cache = (
+            _ResultCache(maxsize=1024, ttl=self.result_cache_ttl)
+            if self.result_cache_ttl > 0
+            else None
+        )
+        # Shared by every tool from this server, so parallel tool calls cannot
+        # overload it (0 disables the limit).
+        semaphore = (
+            asyncio.Semaphore(self.max_concurrent_tool_calls)
+            if self.max_concurrent_tool_calls > 0
+            else None
+        )
+        tools = [
+            self._wrap_tool_with_cache_and_defaults(
+                t,
+                result_cache,
+                self.offload_store,
+                semaphore,
+                invalidate_cache=not self._is_cacheable(t),
+            )
+            for t in tools
+        ]
+        cached = (time.monotonic(), tools)
+        self._TOOLS_CACHE[cache_key] = cached
+        return cached
+
+    def needs_refresh(self) -> bool:
+        """Whether `initialize()` must run before serving the next request.
+
+        True until the agent is first initialized and again once its MCP tool
+        list is older than MCP_TOOLS_TTL, so changes on the server are picked
+        up without a restart.
+        """
+        return (
+            self.graph is None
+            or time.monotonic() - self._tools_fetched_at
+            >= self.cache_ttl_seconds
+        )
+
     async def initialize(self):
         """Initialize the MCP client and load tools."""
+        from langchain_mcp_adapters.client import MultiServerMCPClient
+
+        api_key = os.getenv('SUPABASE_API_KEY', '')
         # Create MultiServerMCPClient for HTTP MCP server connection
         self.mcp_client = MultiServerMCPClient(
             {
-                "supabase": {
-                    "url": self.mcp_server_url,
-                    "transport": "streamable_http",
-                    "headers": {  
-                        "Authorization": f"Bearer {os.getenv('SUPABASE_API_KEY', '')}"
+                'supabase': {
+                    'url': self.mcp_server_url,
+                    'transport': 'streamable_http',
+                    'headers': {  
+                        'Authorization': f'Bearer {api_key}'
                     },  
                     # Supabase MCP does not support session termination via DELETE.
                     # Avoid noisy warnings on close.
-                    "terminate_on_close": False,
+                    'terminate_on_close': False,
+                    # Reuse pooled connections across MCP sessions.
+                    'httpx_client_factory': _mcp_httpx_client_factory,
                 }
             }
         )
         
-        # Get tools from MCP server
-        self.tools = await self.mcp_client.get_tools()
-        self.tools = [self._wrap_tool_with_schema_defaults(t) for t in self.tools]
-        
-        # Create the ReAct agent with MCP tools
-        self.graph = create_react_agent(
-            self.model,
-            tools=self.tools,
-            checkpointer=memory,
-            prompt=self.SYSTEM_INSTRUCTION,
+        connection_key = (
+            self.mcp_server_url,
+            hashlib.sha256(api_key.encode()).hexdigest(),
+        )
+
+        # Serialize initialization so concurrent executors share one tool
+        # fetch and one compiled graph instead of racing to build their own.
+        async with self._GRAPH_LOCK:
+            # Requests queued behind a refresh find it already done.
+            if not self.needs_refresh():
+                return
+
+            # Get tools from MCP server (cached for MCP_TOOLS_TTL seconds)
+            try:
+                fetched_at, tools = await self._load_tools(connection_key)
+            except Exception:
+                if self.graph is None:
+                    raise
+                # Keep serving with the tools already loaded and retry after
+                # another MCP_TOOLS_TTL rather than on every request.
+                logger.warning(
+                    'Refreshing MCP tools failed; keeping the current tools.',
+                    exc_info=True,
+                )
+                self._tools_fetched_at = time.monotonic()
+                return
+            self._tools_fetched_at, self.tools = fetched_at, tools
+
+            # Create the ReAct agent with MCP tools. The compiled graph is
+            # stateless per conversation (MemorySaver isolates thread_ids), so
+            # it is rebuilt only when the MCP tool schemas change.
+            graph_key = (
+                *connection_key,
+                self.tool_mode,
+                _tools_fingerprint(self.tools),
+            )
+            graph = self._GRAPH_CACHE.get(graph_key)
+            if graph is None:
+                graph = self._build_graph()
+                # Drop graphs compiled for this server's previous tool schemas.
+                for key in [
+                    k for k in self._GRAPH_CACHE if k[:-1] == graph_key[:-1]
+                ]:
+                    del self._GRAPH_CACHE[key]
+                self._GRAPH_CACHE[graph_key] = graph
+            self.graph = graph
+
+    def _build_graph(self) -> CompiledStateGraph:
+        """Compile the ReAct graph for the current tools and tool mode."""
+        from langgraph.prebuilt import create_react_agent
+
+        from app.tool_retrieval import ToolRetriever
+
+        # Offloaded results can only be read back through read_storage_ref.
+        local_tools = (
+            [self.offload_store.read_tool] if self.offload_store else []
+        )
+
+        if self.tool_mode != 'retrieval':
+            tools = [*self.tools, *local_tools]
+            # Let the LLM emit independent tool calls in one message; the
+            # graph runs each of them concurrently. OpenAI rejects
+            # parallel_tool_calls when no tools are bound.
+            model = (
+                self.model.bind_tools(tools, parallel_tool_calls=True)
+                if tools
+                else self.model
+            )
+            return create_react_agent(
+                model,
+                tools=tools,
+                checkpointer=_get_memory(),
+                prompt=self.SYSTEM_INSTRUCTION,
+                response_format=(self.FORMAT_INSTRUCTION, ResponseFormat),
+            )
+
+        # Every tool stays registered for execution, but the model only sees
+        # mcp_retrieval, the local tools and whatever it has retrieved so far.
+        retriever = ToolRetriever(self.tools, pinned=local_tools)
+        return create_react_agent(
+            retriever.model_selector(self.model),
+            tools=[retriever.retrieval_tool, *local_tools, *self.tools],
+            checkpointer=_get_memory(),
+            prompt=self.SYSTEM_INSTRUCTION + self.RETRIEVAL_INSTRUCTION,
             response_format=(self.FORMAT_INSTRUCTION, ResponseFormat),
         )
 
@@ -143,67 +558,57 @@ class SupabaseAgent:
         # expose a close() method.
         self.mcp_client = None
 
-    async def stream(self, query, context_id) -> AsyncIterable[dict[str, Any]]:
+    async def stream(self, query, context_id) -> AsyncIterable[Mapping[str, Any]]:
         """Stream agent responses."""
+        from langchain_core.messages import AIMessage, ToolMessage
+
         if not self.graph:
             raise RuntimeError("Agent not initialized. Call initialize() first.")
         
         inputs = {'messages': [('user', query)]}
         config = {'configurable': {'thread_id': context_id}}
 
-        async for item in self.graph.astream(inputs, config, stream_mode='values'):
-            message = item['messages'][-1]
-            if (
-                isinstance(message, AIMessage)
-                and message.tool_calls
-                and len(message.tool_calls) > 0
-            ):
-                yield {
-                    'is_task_complete': False,
-                    'require_user_input': False,
-                    'content': 'Querying Supabase database via MCP...',
-                }
-            elif isinstance(message, ToolMessage):
-                yield {
-                    'is_task_complete': False,
-                    'require_user_input': False,
-                    'content': 'Processing database results...',
-                }
+        # 'updates' yields only the messages each node added, rather than the
+        # whole accumulated state per step; consecutive duplicate statuses
+        # (e.g. one ToolMessage per parallel tool call) are collapsed.
+        last_event = None
+        async for update in self.graph.astream(
+            inputs, config, stream_mode='updates'
+        ):
+            for node_update in update.values():
+                if not (
+                    isinstance(node_update, dict) and node_update.get('messages')
+                ):
+                    continue
+                match node_update['messages'][-1]:
+                    case AIMessage(tool_calls=[_, *_]):
+                        event = _QUERY_EVENT
+                    case ToolMessage():
+                        event = _PROCESS_EVENT
+                    case _:
+                        continue
+                if event is not last_event:
+                    last_event = event
+                    yield event
 
         yield self.get_agent_response(config)
 
-    def get_agent_response(self, config):
+    def get_agent_response(self, config) -> Mapping[str, Any]:
         current_state = self.graph.get_state(config)
         structured_response = current_state.values.get('structured_response')
-        if structured_response and isinstance(
-            structured_response, ResponseFormat
-        ):
-            if structured_response.status == 'input_required':
-                return {
-                    'is_task_complete': False,
-                    'require_user_input': True,
-                    'content': structured_response.message,
-                }
-            if structured_response.status == 'error':
-                return {
-                    'is_task_complete': False,
-                    'require_user_input': True,
-                    'content': structured_response.message,
-                }
-            if structured_response.status == 'completed':
-                return {
-                    'is_task_complete': True,
-                    'require_user_input': False,
-                    'content': structured_response.message,
-                }
+        # LangGraph has already validated the response against ResponseFormat,
+        # so read the fields directly instead of re-checking the type.
+        template = self._STATUS_TEMPLATES.get(
+            getattr(structured_response, 'status', None)
+        )
+        if template is not None:
+            is_task_complete, require_user_input = template
+            return {
+                'is_task_complete': is_task_complete,
+                'require_user_input': require_user_input,
+                'content': structured_response.message,
+            }
 
-        return {
-            'is_task_complete': False,
-            'require_user_input': True,
-            'content': (
-                'We are unable to process your request at the moment. '
-                'Please try again.'
-            ),
-        }
+        return _FALLBACK_RESPONSE
 
     SUPPORTED_CONTENT_TYPES = ['text', 'text/plain']
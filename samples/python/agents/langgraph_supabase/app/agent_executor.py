@@ -29,13 +29,11 @@ class SupabaseAgentExecutor(AgentExecutor):
 
     def __init__(self):
         self.agent = SupabaseAgent()
-        self._initialized = False
 
     async def _initialize_agent(self):
-        """Initialize the agent and MCP client if not already done."""
-        if not self._initialized:
+        """Initialize the agent, or reload its MCP tools once they expire."""
+        if self.agent.needs_refresh():
             await self.agent.initialize()
-            self._initialized = True
 
     async def execute(
         self,
@@ -46,7 +44,7 @@ class SupabaseAgentExecutor(AgentExecutor):
         if error:
             raise ServerError(error=InvalidParamsError())
 
-        # Initialize agent on first request
+        # Initialize agent on first request and after MCP_TOOLS_TTL
         await self._initialize_agent()
 
         query = context.get_user_input()
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import hashlib
+import json
+import os
+import re
+import shutil
+import stat
+import tempfile
+import time
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+
+if TYPE_CHECKING:
+    from langchain_core.tools import BaseTool
+
+
+REF_PREFIX = 'mcp-ref://'
+READ_TOOL_NAME = 'read_storage_ref'
+SUMMARY_CHARS = 1000
+READ_LIMIT_CHARS = 4000
+
+# MCP adapter tools return a `(content, artifact)` pair.
+_CONTENT_AND_ARTIFACT_LEN = 2
+
+_DIGEST_RE = re.compile(r'[0-9a-f]{64}')
+
+
+class OffloadStore:
+    """Keeps large MCP tool outputs out of the LLM prompt.
+
+    Text outputs larger than `threshold` bytes are written to a private
+    `directory` and replaced by a small JSON stub with a `storage_ref` and a
+    leading summary. The model reads the rest back page by page through the
+    `read_storage_ref` tool; stored results are never substituted into MCP
+    tool arguments.
+
+    Stored files are removed once older than `max_age` seconds or when the
+    directory grows past `max_bytes`, oldest first.
+    """
+
+    def __init__(
+        self,
+        directory: Path | None,
+        threshold: int,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_age: float = 3600.0,
+    ):
+        if directory is None:
+            directory = Path(tempfile.mkdtemp(prefix='supabase_mcp_offload_'))
+            atexit.register(shutil.rmtree, directory, ignore_errors=True)
+        else:
+            directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            _check_private(directory)
+        self.directory = directory
+        self.threshold = threshold
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._read_tool: BaseTool | None = None
+
+    async def offload(self, content: str) -> str:
+        """Store `content` if it exceeds the threshold and return a stub.
+
+        Content is returned unchanged when the stub would not be smaller.
+        """
+        data = content.encode()
+        if len(data) <= self.threshold:
+            return content
+
+        digest = hashlib.sha256(data).hexdigest()
+        stub = json.dumps(
+            {
+                'storage_ref': f'{REF_PREFIX}{digest}',
+                'size_chars': len(content),
+                'summary': content[:SUMMARY_CHARS],
+                'note': (
+                    f'Result truncated. Call {READ_TOOL_NAME} with this '
+                    f'storage_ref and offset={SUMMARY_CHARS} to read the rest.'
+                ),
+            }
+        )
+        if len(stub.encode()) >= len(data):
+            return content
+
+        await asyncio.to_thread(self._write, digest, data)
+        return stub
+
+    async def offload_result(self, result: Any) -> Any:
+        """Offload the text content of a tool result.
+
+        MCP adapter tools return `(content, artifact)` where content is a
+        string or a list of strings or `{'type': 'text', 'text': ...}`
+        blocks; plain tools return the content itself.
+        """
+        if isinstance(result, tuple) and len(result) == _CONTENT_AND_ARTIFACT_LEN:
+            content, artifact = result
+            return await self._offload_content(content), artifact
+        return await self._offload_content(result)
+
+    async def read(self, storage_ref: str) -> str | None:
+        """Return the stored text for `storage_ref`.
+
+        Returns None for unknown or expired refs, and for files whose content
+        no longer matches their sha256 name.
+        """
+        digest = storage_ref.removeprefix(REF_PREFIX)
+        if not _DIGEST_RE.fullmatch(digest):
+            return None
+        return await asyncio.to_thread(self._read, digest)
+
+    @property
+    def read_tool(self) -> BaseTool:
+        """The `read_storage_ref` tool paging through stored results."""
+        if self._read_tool is None:
+            from langchain_core.tools.structured import (  # noqa: PLC0415
+                StructuredTool,
+            )
+
+            async def read_storage_ref(
+                storage_ref: str, offset: int = 0, limit: int = READ_LIMIT_CHARS
+            ) -> str:
+                """Read part of a truncated tool result.
+
+                Pass the storage_ref from a truncated result, the character
+                offset to start at, and how many characters to return.
+                """
+                text = await self.read(storage_ref)
+                if text is None:
+                    return json.dumps(
+                        {'error': f'Unknown or expired storage_ref: {storage_ref}'}
+                    )
+                start = max(offset, 0)
+                end = start + min(max(limit, 0), READ_LIMIT_CHARS)
+                return json.dumps(
+                    {
+                        'storage_ref': storage_ref,
+                        'offset': start,
+                        'text': text[start:end],
+                        'next_offset': end if end < len(text) else None,
+                    }
+                )
+
+            self._read_tool = StructuredTool.from_function(
+                coroutine=read_storage_ref, name=READ_TOOL_NAME
+            )
+        return self._read_tool
+
+    async def _offload_content(self, content: Any) -> Any:
+        if isinstance(content, str):
+            return await self.offload(content)
+        if isinstance(content, list):
+            return [await self._offload_item(item) for item in content]
+        return content
+
+    async def _offload_item(self, item: Any) -> Any:
+        if isinstance(item, str):
+            return await self.offload(item)
+        if (
+            isinstance(item, dict)
+            and item.get('type') == 'text'
+            and isinstance(item.get('text'), str)
+        ):
+            return {**item, 'text': await self.offload(item['text'])}
+        return item
+
+    def _write(self, digest: str, data: bytes) -> None:
+        path = self.directory / f'{digest}.txt'
+        try:
+            # Same content already stored; refresh its age.
+            os.utime(path)
+        except FileNotFoundError:
+            # mkstemp creates the file 0600; the rename makes it appear whole.
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                Path(tmp).replace(path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+        self._prune()
+
+    def _read(self, digest: str) -> str | None:
+        path = self.directory / f'{digest}.txt'
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        if hashlib.sha256(data).hexdigest() != digest:
+            path.unlink(missing_ok=True)
+            return None
+        return data.decode()
+
+    def _prune(self) -> None:
+        files = []
+        for path in self.directory.glob('*.txt'):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        files.sort()
+
+        cutoff = time.time() - self.max_age
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            if mtime >= cutoff and total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def _check_private(directory: Path) -> None:
+    """Refuse a directory other local users can read or replace files in."""
+    if not hasattr(os, 'getuid'):
+        return
+    st = directory.stat()
+    if st.st_uid != os.getuid() or stat.S_IMODE(st.st_mode) & 0o077:
+        raise PermissionError(
+            f'{directory} must be owned by the current user and not '
+            'accessible to others (chmod 700)'
+        )
@@ -0,0 +1,50 @@
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import orjson
+
+from a2a.extensions.common import HTTP_EXTENSION_HEADER
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.context import ServerCallContext
+from starlette.responses import JSONResponse, Response
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson instead of the stdlib json module."""
+
+    def render(self, content: Any) -> bytes:
+        """Encode `content`, falling back to the stdlib for what orjson rejects.
+
+        orjson refuses integers wider than 64 bits, which a client can send
+        as a JSON-RPC id.
+        """
+        try:
+            return orjson.dumps(content)
+        except (orjson.JSONEncodeError, TypeError):
+            return super().render(content)
+
+
+class ORJSONA2AStarletteApplication(A2AStarletteApplication):
+    """A2AStarletteApplication that encodes JSON-RPC replies with orjson.
+
+    Streaming (SSE) responses are left to the SDK, which already serializes
+    each event with pydantic's `model_dump_json`.
+    """
+
+    def _create_response(
+        self, context: ServerCallContext, handler_result: Any
+    ) -> Response:
+        if isinstance(handler_result, AsyncGenerator):
+            return super()._create_response(context, handler_result)
+
+        headers = {}
+        if exts := context.activated_extensions:
+            headers[HTTP_EXTENSION_HEADER] = ', '.join(sorted(exts))
+
+        # JSONRPCErrorResponse is a plain model; success responses are
+        # RootModels wrapping the actual payload.
+        model = getattr(handler_result, 'root', handler_result)
+        return ORJSONResponse(
+            model.model_dump(mode='json', exclude_none=True),
+            headers=headers,
+        )
@@ -0,0 +1,130 @@
+# ruff: noqa: PLC0415
+from __future__ import annotations
+
+import json
+import re
+
+from typing import TYPE_CHECKING, Any
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.messages import BaseMessage
+    from langchain_core.tools import BaseTool
+
+
+RETRIEVAL_TOOL_NAME = 'mcp_retrieval'
+
+# Bound models are cached per retrieved tool set; cap the number of sets.
+_MAX_BOUND_MODELS = 128
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def _tokenize(text: str) -> set[str]:
+    return set(_TOKEN_RE.findall(text.lower()))
+
+
+class ToolRetriever:
+    """ScaleMCP-style on-demand tool binding for large MCP servers.
+
+    Instead of putting every MCP tool signature in the prompt, the model is
+    bound to a single `mcp_retrieval` tool that returns the top-k tools
+    matching its keywords. Tools returned by earlier retrievals in the
+    conversation are then bound for the following turns. `pinned` tools are
+    always bound and never returned by a search.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[BaseTool],
+        top_k: int = 5,
+        pinned: Sequence[BaseTool] = (),
+    ):
+        from langchain_core.tools.structured import StructuredTool
+
+        self.tools = {tool.name: tool for tool in tools}
+        self.top_k = top_k
+        self.pinned = list(pinned)
+        self._index = [
+            (tool.name, _tokenize(f'{tool.name} {tool.description}'))
+            for tool in tools
+        ]
+        self._bound_models: dict[tuple[str, ...], Any] = {}
+
+        async def mcp_retrieval(keywords: str) -> str:
+            """Find the database tools relevant to a task.
+
+            Pass space-separated keywords (e.g. "list tables schema"). Returns
+            the matching tools' names, descriptions and argument schemas; call
+            those tools directly afterwards.
+            """
+            return json.dumps(
+                [
+                    {
+                        'name': tool.name,
+                        'description': tool.description,
+                        'args_schema': tool.args_schema
+                        if isinstance(tool.args_schema, dict)
+                        else None,
+                    }
+                    for tool in self.search(keywords)
+                ]
+            )
+
+        self.retrieval_tool = StructuredTool.from_function(
+            coroutine=mcp_retrieval, name=RETRIEVAL_TOOL_NAME
+        )
+
+    def search(self, keywords: str) -> list[BaseTool]:
+        """Return up to `top_k` tools ranked by keyword overlap."""
+        query = _tokenize(keywords)
+        scored = sorted(
+            (-len(query & tokens), name)
+            for name, tokens in self._index
+            if query & tokens
+        )
+        return [self.tools[name] for _, name in scored[: self.top_k]]
+
+    def retrieved_tools(self, messages: Sequence[BaseMessage]) -> list[BaseTool]:
+        """Return the tools surfaced by earlier `mcp_retrieval` calls."""
+        from langchain_core.messages import ToolMessage
+
+        names: dict[str, None] = {}
+        for message in messages:
+            if not (
+                isinstance(message, ToolMessage)
+                and message.name == RETRIEVAL_TOOL_NAME
+            ):
+                continue
+            try:
+                entries = json.loads(message.content)
+            except (TypeError, ValueError):
+                continue
+            for entry in entries:
+                if isinstance(entry, dict) and entry.get('name') in self.tools:
+                    names[entry['name']] = None
+        return [self.tools[name] for name in names]
+
+    def model_selector(
+        self, model: BaseChatModel
+    ) -> Callable[[dict[str, Any], Any], Any]:
+        """Build a dynamic-model callable for `create_react_agent`."""
+
+        def select_model(state: dict[str, Any], runtime: Any) -> Any:
+            tools = self.retrieved_tools(state['messages'])
+            key = tuple(tool.name for tool in tools)
+            bound = self._bound_models.get(key)
+            if bound is None:
+                if len(self._bound_models) >= _MAX_BOUND_MODELS:
+                    self._bound_models.clear()
+                bound = model.bind_tools(
+                    [self.retrieval_tool, *self.pinned, *tools],
+                    parallel_tool_calls=True,
+                )
+                self._bound_models[key] = bound
+            return bound
+
+        return select_model
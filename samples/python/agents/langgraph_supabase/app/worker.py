@@ -0,0 +1,17 @@
+from typing import Any
+
+from uvicorn_worker import UvicornWorker
+
+from app.__main__ import UVICORN_SETTINGS
+
+
+class SupabaseUvicornWorker(UvicornWorker):
+    """Gunicorn worker running the same uvicorn settings as `uv run app`."""
+
+    CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, **UVICORN_SETTINGS}
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # UvicornWorker ignores gunicorn's worker_connections; enforce it as
+        # uvicorn's per-worker concurrency limit (excess requests get a 503).
+        self.config.limit_concurrency = self.cfg.worker_connections
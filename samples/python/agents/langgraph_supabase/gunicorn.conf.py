@@ -0,0 +1,15 @@
+"""Gunicorn settings for running the Supabase Agent.
+
+Usage: gunicorn 'app.__main__:app_factory()' -c gunicorn.conf.py
+"""
+
+import os
+
+
+bind = f'{os.getenv("HOST", "localhost")}:{os.getenv("PORT", "10001")}'
+worker_class = 'app.worker.SupabaseUvicornWorker'
+# Tasks, push configs and conversation memory live in each worker's memory,
+# so one worker is the only safe default; see the README before raising it.
+workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+worker_connections = 1000
+keepalive = 30
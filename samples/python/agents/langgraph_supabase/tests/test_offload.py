@@ -0,0 +1,129 @@
+import asyncio
+import json
+import os
+import stat
+
+import pytest
+
+from app.offload import REF_PREFIX, SUMMARY_CHARS, OffloadStore
+
+
+LARGE = 'row,' * 2000
+PRIVATE_DIR_MODE = 0o700
+PRIVATE_FILE_MODE = 0o600
+
+
+@pytest.fixture
+def store(tmp_path):
+    return OffloadStore(tmp_path / 'offload', threshold=100)
+
+
+def offload(store, content):
+    return asyncio.run(store.offload(content))
+
+
+def read_page(store, ref, offset=0, limit=4000):
+    return json.loads(
+        asyncio.run(
+            store.read_tool.ainvoke(
+                {'storage_ref': ref, 'offset': offset, 'limit': limit}
+            )
+        )
+    )
+
+
+def test_small_content_is_kept(store):
+    assert offload(store, 'ok') == 'ok'
+    assert not list(store.directory.iterdir())
+
+
+def test_large_content_is_offloaded_and_read_back(store):
+    stub = json.loads(offload(store, LARGE))
+
+    assert stub['storage_ref'].startswith(REF_PREFIX)
+    assert stub['summary'] == LARGE[:SUMMARY_CHARS]
+    assert asyncio.run(store.read(stub['storage_ref'])) == LARGE
+
+
+def test_read_tool_pages_through_the_result(store):
+    ref = json.loads(offload(store, LARGE))['storage_ref']
+
+    page = read_page(store, ref, offset=SUMMARY_CHARS, limit=3000)
+    assert page['text'] == LARGE[SUMMARY_CHARS : SUMMARY_CHARS + 3000]
+    assert page['next_offset'] == SUMMARY_CHARS + 3000
+
+    last = read_page(store, ref, offset=page['next_offset'])
+    assert last['text'] == LARGE[page['next_offset'] :]
+    assert last['next_offset'] is None
+
+
+def test_content_is_kept_when_stub_is_not_smaller(tmp_path):
+    store = OffloadStore(tmp_path / 'offload', threshold=10)
+    content = 'x' * 200
+
+    assert offload(store, content) == content
+    assert not list(store.directory.iterdir())
+
+
+def test_text_blocks_are_offloaded(store):
+    artifact = object()
+    image = {'type': 'image', 'data': 'abc'}
+
+    content, returned_artifact = asyncio.run(
+        store.offload_result(
+            ([{'type': 'text', 'text': LARGE, 'id': '1'}, image], artifact)
+        )
+    )
+
+    assert returned_artifact is artifact
+    assert content[1] == image
+    assert content[0]['type'] == 'text'
+    assert content[0]['id'] == '1'
+    ref = json.loads(content[0]['text'])['storage_ref']
+    assert asyncio.run(store.read(ref)) == LARGE
+
+
+def test_files_are_private(store):
+    offload(store, LARGE)
+
+    assert stat.S_IMODE(store.directory.stat().st_mode) == PRIVATE_DIR_MODE
+    for path in store.directory.iterdir():
+        assert stat.S_IMODE(path.stat().st_mode) == PRIVATE_FILE_MODE
+
+
+def test_shared_directory_is_rejected(tmp_path):
+    shared = tmp_path / 'shared'
+    shared.mkdir(mode=0o755)
+    shared.chmod(0o755)
+
+    with pytest.raises(PermissionError):
+        OffloadStore(shared, threshold=100)
+
+
+def test_tampered_file_is_not_returned(store):
+    ref = json.loads(offload(store, LARGE))['storage_ref']
+    (store.directory / f'{ref.removeprefix(REF_PREFIX)}.txt').write_text('x')
+
+    assert asyncio.run(store.read(ref)) is None
+    assert 'error' in read_page(store, ref)
+
+
+def test_unknown_refs_are_rejected(store):
+    assert asyncio.run(store.read(f'{REF_PREFIX}{"0" * 64}')) is None
+    assert asyncio.run(store.read(f'{REF_PREFIX}../etc/passwd')) is None
+
+
+def test_old_and_excess_files_are_pruned(tmp_path):
+    store = OffloadStore(tmp_path / 'offload', threshold=100, max_bytes=20000)
+    first = json.loads(offload(store, LARGE))['storage_ref']
+    path = store.directory / f'{first.removeprefix(REF_PREFIX)}.txt'
+    os.utime(path, (0, 0))
+
+    second = json.loads(offload(store, 'col,' * 2000))['storage_ref']
+    assert asyncio.run(store.read(first)) is None
+    assert asyncio.run(store.read(second)) is not None
+
+    for i in range(5):
+        offload(store, f'{i}' * 8000)
+    total = sum(p.stat().st_size for p in store.directory.iterdir())
+    assert total <= store.max_bytes
@@ -0,0 +1,78 @@
+import asyncio
+
+from langchain_core.tools.structured import StructuredTool
+
+from app.agent import SupabaseAgent, _ResultCache
+
+
+wrap = SupabaseAgent._wrap_tool_with_cache_and_defaults
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.value = 'old'
+        self.reads = 0
+        self.read_started = asyncio.Event()
+        self.release_read = asyncio.Event()
+        self.block_reads = False
+
+    def tools(self, cache):
+        async def list_rows(table: str) -> str:
+            self.reads += 1
+            value = self.value
+            if self.block_reads:
+                self.read_started.set()
+                await self.release_read.wait()
+            return value
+
+        async def execute_sql(query: str) -> str:
+            self.value = query
+            return 'ok'
+
+        read = StructuredTool.from_function(
+            coroutine=list_rows, name='list_rows', description='read'
+        )
+        write = StructuredTool.from_function(
+            coroutine=execute_sql, name='execute_sql', description='write'
+        )
+        return wrap(read, cache), wrap(write, cache, invalidate_cache=True)
+
+
+def test_identical_reads_are_cached():
+    async def run():
+        db = FakeDatabase()
+        read, _ = db.tools(_ResultCache(maxsize=16, ttl=60))
+        first = await read.ainvoke({'table': 't'})
+        second = await read.ainvoke({'table': 't'})
+        return db.reads, first, second
+
+    assert asyncio.run(run()) == (1, 'old', 'old')
+
+
+def test_write_invalidates_cached_reads():
+    async def run():
+        db = FakeDatabase()
+        read, write = db.tools(_ResultCache(maxsize=16, ttl=60))
+        await read.ainvoke({'table': 't'})
+        await write.ainvoke({'query': 'new'})
+        return await read.ainvoke({'table': 't'})
+
+    assert asyncio.run(run()) == 'new'
+
+
+def test_read_overlapping_a_write_is_not_cached():
+    async def run():
+        db = FakeDatabase()
+        read, write = db.tools(_ResultCache(maxsize=16, ttl=60))
+        db.block_reads = True
+        pending = asyncio.create_task(read.ainvoke({'table': 't'}))
+        await db.read_started.wait()
+
+        await write.ainvoke({'query': 'new'})
+        db.release_read.set()
+        stale = await pending
+
+        db.block_reads = False
+        return stale, await read.ainvoke({'table': 't'})
+
+    assert asyncio.run(run()) == ('old', 'new')